@@ -1,26 +1,112 @@
 from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import RequestEntityTooLarge
 from flask_cors import CORS
+import functools
 import json
+import math
+import operator
 import os
-import tempfile
-from werkzeug.utils import secure_filename
-from jsonschema import validate, ValidationError
-from typing import Dict, Any, List, Union, Optional
+import re
+try:
+    import orjson
+except ImportError:
+    # orjson only ships CPython builds; elsewhere (e.g. PyPy) the standard library json is used
+    orjson = None
+import fastjsonschema
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Union, Optional
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson instead of the standard library."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._dump_bytes(obj, kwargs.get('indent')).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return _json_loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # Comparison results can be larger than the uploads, so the encoded bytes
+        # go straight into the response without a round trip through str
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dump_bytes(obj, indent), mimetype=self.mimetype)
+
+    def _dump_bytes(self, obj: Any, indent: Any = None) -> bytes:
+        option = orjson.OPT_SORT_KEYS if self.sort_keys else 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            # orjson cannot write integers beyond 64 bits, which _json_loads keeps exact
+            return super().dumps(obj, indent=2 if indent else None).encode()
+
+# orjson turns integers outside the 64-bit range into floats, so documents with
+# integer literals that long are parsed by the standard library, which keeps them exact
+_LONG_INTEGER = re.compile(r'-\d{19,}|\d{20,}')
+_LONG_INTEGER_BYTES = re.compile(rb'-\d{19,}|\d{20,}')
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when it is available and can represent every number exactly."""
+    if orjson is not None:
+        long_integer = _LONG_INTEGER_BYTES if isinstance(data, bytes) else _LONG_INTEGER
+        if not long_integer.search(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # NaN, Infinity and lone surrogate escapes are only accepted by the standard library
+                pass
+    return json.loads(data)
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
+if orjson is not None:
+    app.json = ORJSONProvider(app)
 CORS(app)  # Enable CORS for all routes
 
-# Configure maximum file upload size (500MB)
-app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB in bytes
-
-# Create upload folder if it doesn't exist
-UPLOAD_FOLDER = os.path.join(tempfile.gettempdir(), 'json_comparison_uploads')
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Configure maximum file upload size (500MB, or MAX_UPLOAD_MB from the environment)
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 500)) * 1024 * 1024  # in bytes
 
 # Get port from environment variable or use default
 port = int(os.environ.get('PORT', 5000))
 
+# JSON schema drafts fastjsonschema implements, as named in a schema's $schema URI
+SUPPORTED_SCHEMA_DRAFTS = ('draft-04', 'draft-06', 'draft-07')
+
+class _NoRemoteRefs(dict):
+    """fastjsonschema ``handlers`` that claim every URI scheme so nothing is fetched remotely."""
+
+    def __contains__(self, scheme):
+        return True
+
+    def __getitem__(self, scheme):
+        return _reject_remote_ref
+
+def _reject_remote_ref(uri: str):
+    raise fastjsonschema.JsonSchemaDefinitionException(f"Remote $ref is not allowed: {uri}")
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], Any]:
+    """Compile a user-supplied JSON schema into a validator that never opens a remote ``$ref``."""
+    if not isinstance(schema, (dict, bool)):
+        raise fastjsonschema.JsonSchemaDefinitionException("Schema must be an object or a boolean")
+    # Any other draft would silently be validated with draft-07 rules, skipping its newer keywords
+    version = schema.get('$schema') if isinstance(schema, dict) else None
+    if version is not None and not (isinstance(version, str)
+                                    and any(draft in version for draft in SUPPORTED_SCHEMA_DRAFTS)):
+        raise fastjsonschema.JsonSchemaDefinitionException(
+            f"Unsupported $schema {version!r}, use draft-04, draft-06 or draft-07")
+    try:
+        # Defaults are not written into the validated documents, and formats are
+        # annotations only, as they were with jsonschema
+        return fastjsonschema.compile(schema, handlers=_NoRemoteRefs(), use_default=False, use_formats=False)
+    except fastjsonschema.JsonSchemaDefinitionException:
+        raise
+    except (re.error, AttributeError, TypeError, KeyError, ValueError) as e:
+        # A malformed schema can fail anywhere in fastjsonschema's code generator
+        raise fastjsonschema.JsonSchemaDefinitionException(str(e)) from e
+
 class ComparisonConfig:
     def __init__(self, 
                  ignore_order: bool = False,
@@ -36,27 +122,37 @@ class ComparisonConfig:
         self.ignore_keys = ignore_keys or []
         self.custom_rules = custom_rules or {}
         self.schema = schema
+        # Compiled once so every comparison reuses the same specialized validator
+        self.validator = compile_schema(schema) if schema else None
         self.compare_keys_only = compare_keys_only
 
-def load_json(file_path):
-    """Load JSON data from a file with error handling and encoding support."""
-    # Try UTF-8 first (most common for JSON)
+def file_label(filename: str) -> str:
+    """Reduce an uploaded file name to a short label for the results (uploads never touch disk)."""
+    return filename.rsplit('/', 1)[-1].rsplit('\\', 1)[-1][:255]
+
+def load_json(file):
+    """Load JSON data from an uploaded file with error handling and encoding support."""
+    # Uploads are parsed straight from the request stream instead of being saved to disk first
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file), None
-    except UnicodeDecodeError:
-        # If UTF-8 fails, try with Latin-1 (which can handle any byte value)
+        data = file.read()
+    except Exception as e:
+        return None, f"Error reading file {file_label(file.filename)}: {str(e)}"
+
+    # The parser reads the raw bytes directly and expects UTF-8 (most common for JSON)
+    try:
+        return _json_loads(data), None
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         try:
-            with open(file_path, 'r', encoding='latin-1') as file:
-                return json.load(file), None
-        except Exception as e:
-            return None, f"Failed to decode file with multiple encodings: {str(e)}"
-    except FileNotFoundError:
-        return None, f"File not found: {file_path}"
-    except json.JSONDecodeError as e:
-        return None, f"Invalid JSON in file {file_path}: {e}"
+            data.decode('utf-8')
+        except UnicodeDecodeError:
+            # If UTF-8 fails, try with Latin-1 (which can handle any byte value)
+            try:
+                return _json_loads(data.decode('latin-1')), None
+            except Exception as e:
+                return None, f"Failed to decode file with multiple encodings: {str(e)}"
+        return None, f"Invalid JSON in file {file_label(file.filename)}: {e}"
     except Exception as e:
-        return None, f"Error reading file {file_path}: {str(e)}"
+        return None, f"Error reading file {file_label(file.filename)}: {str(e)}"
 
 def compare_values(val1: Any, val2: Any, config: ComparisonConfig) -> bool:
     """Compare two values with respect to the comparison configuration."""
@@ -68,89 +164,205 @@ def compare_values(val1: Any, val2: Any, config: ComparisonConfig) -> bool:
     
     return val1 == val2
 
-def compare_arrays(arr1: List[Any], arr2: List[Any], config: ComparisonConfig) -> bool:
+def _within_tolerance(val1: Any, val2: Any, tolerance: float) -> bool:
+    """Compare two values, allowing numbers to differ by up to ``tolerance``."""
+    if isinstance(val1, (int, float)) and isinstance(val2, (int, float)):
+        if isinstance(val1, float) or isinstance(val2, float):
+            return math.isclose(val1, val2, rel_tol=0.0, abs_tol=tolerance)
+        return abs(val1 - val2) <= tolerance
+    return val1 == val2
+
+def _equal_ignoring_case(val1: Any, val2: Any, config: ComparisonConfig, folded: Dict[str, str]) -> bool:
+    """Case-insensitive ``compare_values`` that memoizes lowercased strings in ``folded``."""
+    if type(val1) is str and type(val2) is str:
+        lowered1 = folded.get(val1)
+        if lowered1 is None:
+            lowered1 = folded[val1] = val1.lower()
+        lowered2 = folded.get(val2)
+        if lowered2 is None:
+            lowered2 = folded[val2] = val2.lower()
+        return lowered1 == lowered2
+    return compare_values(val1, val2, config)
+
+def value_comparator(config: ComparisonConfig,
+                     folded: Optional[Dict[str, str]] = None) -> Callable[[Any, Any], bool]:
+    """Return the cheapest two-argument function equivalent to ``compare_values`` for ``config``."""
+    if config.case_insensitive:
+        # ``folded`` can be shared between comparisons so each distinct string is lowercased once
+        return functools.partial(_equal_ignoring_case, config=config,
+                                 folded={} if folded is None else folded)
+    if config.numeric_tolerance < 0:
+        return functools.partial(compare_values, config=config)
+    if config.numeric_tolerance == 0:
+        # Numbers within a zero tolerance are simply equal
+        return operator.eq
+    return functools.partial(_within_tolerance, tolerance=config.numeric_tolerance)
+
+def _partition_array(items: List[Any], case_insensitive: bool) -> tuple:
+    """Split array items into numbers, a multiset of other scalars, and nested values."""
+    numbers, scalars, nested = [], Counter(), []
+    for item in items:
+        if isinstance(item, (int, float)):
+            numbers.append(item)
+        elif isinstance(item, (list, dict)):
+            nested.append(item)
+        elif case_insensitive and isinstance(item, str):
+            scalars[item.lower()] += 1
+        else:
+            scalars[item] += 1
+    return numbers, scalars, nested
+
+def compare_arrays(arr1: List[Any], arr2: List[Any], config: ComparisonConfig,
+                   values_equal: Optional[Callable[[Any, Any], bool]] = None) -> bool:
     """Compare arrays with optional order ignoring."""
     if len(arr1) != len(arr2):
         return False
     
+    if values_equal is None:
+        values_equal = value_comparator(config)
+
     if not config.ignore_order:
-        return all(compare_values(a, b, config) for a, b in zip(arr1, arr2))
+        return all(map(values_equal, arr1, arr2))
     
-    # For order-ignoring comparison, we need to check if all elements in arr1 exist in arr2
-    arr2_copy = arr2.copy()
-    for item1 in arr1:
-        found = False
-        for i, item2 in enumerate(arr2_copy):
-            if compare_values(item1, item2, config):
-                arr2_copy.pop(i)
-                found = True
+    # Numbers, other scalars and nested values never compare equal to each other,
+    # so each group can be matched on its own
+    numbers1, scalars1, nested1 = _partition_array(arr1, config.case_insensitive)
+    numbers2, scalars2, nested2 = _partition_array(arr2, config.case_insensitive)
+    if len(numbers1) != len(numbers2) or len(nested1) != len(nested2) or scalars1 != scalars2:
+        return False
+
+    if config.numeric_tolerance:
+        # Pairing both sides in sorted order finds a match within tolerance whenever one exists
+        numbers1.sort()
+        numbers2.sort()
+        if any(abs(a - b) > config.numeric_tolerance for a, b in zip(numbers1, numbers2)):
+            return False
+    elif Counter(numbers1) != Counter(numbers2):
+        return False
+
+    # Nested arrays and objects are unhashable, so they are still matched pairwise
+    nested2 = nested2.copy()
+    for item1 in nested1:
+        for i, item2 in enumerate(nested2):
+            if values_equal(item1, item2):
+                del nested2[i]
                 break
-        if not found:
+        else:
             return False
     return True
 
+def _rule_suffixes(custom_rules: Dict[str, Any]) -> set:
+    """Collect every dot-separated suffix of the custom rule paths."""
+    suffixes = set()
+    for rule_path in custom_rules:
+        parts = rule_path.split(".")
+        for i in range(len(parts)):
+            suffixes.add(".".join(parts[i:]))
+    return suffixes
+
+def _has_rules_below(path: tuple, custom_rules: Dict[str, Any]) -> bool:
+    """Check whether any custom rule path lies inside the subtree at ``path``."""
+    if not custom_rules:
+        return False
+    prefix = ".".join(path) + "."
+    return any(rule_path.startswith(prefix) for rule_path in custom_rules)
+
 def compare_json(reference: Dict[str, Any], target: Dict[str, Any], 
-                config: ComparisonConfig, path: str = "") -> tuple:
-    """Recursively compare two JSON objects with enhanced comparison options."""
+                config: ComparisonConfig, path: str = "",
+                folded: Optional[Dict[str, str]] = None) -> tuple:
+    """Compare two JSON objects with enhanced comparison options."""
     missing, common, differences, additional = {}, {}, {}, {}
 
     # Validate against schema if provided
-    if config.schema and path == "":
+    if config.validator and path == "":
         try:
-            validate(instance=reference, schema=config.schema)
-            validate(instance=target, schema=config.schema)
-        except ValidationError as e:
+            config.validator(reference)
+            config.validator(target)
+        except fastjsonschema.JsonSchemaValueException as e:
             return {}, {}, {}, {"schema_error": str(e)}
 
-    # Track keys present in target but not in reference
-    for key in target:
-        if key not in reference and key not in config.ignore_keys:
-            current_path = f"{path}.{key}" if path else key
-            additional[current_path] = target[key]
+    # Paths are carried as tuples of keys and only joined into dotted strings
+    # when they are written to a result, or could match a custom rule.
+    rule_suffixes = _rule_suffixes(config.custom_rules)
 
-    for key in reference:
-        if key in config.ignore_keys:
-            continue
+    # Equal leaves match under every option, unless a negative tolerance rules out all numbers
+    equal_is_common = config.numeric_tolerance >= 0
 
-        current_path = f"{path}.{key}" if path else key
-        
-        # Apply custom rules if defined
-        if current_path in config.custom_rules:
-            rule = config.custom_rules[current_path]
-            if rule == "ignore":
+    # Options are read once here rather than at every leaf
+    ignore_keys = set(config.ignore_keys)
+    values_equal = value_comparator(config, folded)
+    custom_rules = config.custom_rules
+    compare_keys_only = config.compare_keys_only
+
+    # Objects present on both sides whose children are compared, and objects
+    # that are equal on both sides whose children are all common
+    stack = [(reference, target, tuple(path.split(".")) if path else ())]
+    identical = []
+    while stack:
+        reference, target, path = stack.pop()
+
+        # Track keys present in target but not in reference
+        for key in target.keys() - reference.keys():
+            if key not in ignore_keys:
+                additional[".".join(path + (key,))] = target[key]
+
+        for key, ref_val in reference.items():
+            if key in ignore_keys:
                 continue
-            elif callable(rule):
-                if not rule(reference[key], target.get(key)):
-                    differences[current_path] = {
-                        "reference": reference[key],
-                        "target": target.get(key)
-                    }
+
+            # Apply custom rules if defined
+            if key in rule_suffixes:
+                rule = custom_rules.get(".".join(path + (key,)))
+                if rule == "ignore":
+                    continue
+                elif callable(rule):
+                    if not rule(ref_val, target.get(key)):
+                        differences[".".join(path + (key,))] = {
+                            "reference": ref_val,
+                            "target": target.get(key)
+                        }
+                    continue
+
+            if key not in target:
+                missing[".".join(path + (key,))] = ref_val
                 continue
 
-        if key not in target:
-            missing[current_path] = reference[key]
-        else:
-            ref_val, tgt_val = reference[key], target[key]
-            
-            if isinstance(ref_val, dict) and isinstance(tgt_val, dict):
-                sub_missing, sub_common, sub_diff, sub_add = compare_json(ref_val, tgt_val, config, current_path)
-                missing.update(sub_missing)
-                common.update(sub_common)
-                differences.update(sub_diff)
-                additional.update(sub_add)
-            elif config.compare_keys_only:
+            tgt_val = target[key]
+            if type(ref_val) is dict and type(tgt_val) is dict:
+                # Equal subtrees without custom rules below them are common as a
+                # whole, so their leaves need no comparison
+                current_path = path + (key,)
+                if equal_is_common and ref_val == tgt_val and not _has_rules_below(current_path, custom_rules):
+                    identical.append((ref_val, current_path))
+                else:
+                    stack.append((ref_val, tgt_val, current_path))
+            elif compare_keys_only:
                 # When comparing keys only, add to common if the key exists
-                common[current_path] = ref_val
-            elif isinstance(ref_val, list) and isinstance(tgt_val, list):
-                if compare_arrays(ref_val, tgt_val, config):
-                    common[current_path] = ref_val
+                common[".".join(path + (key,))] = ref_val
+            elif equal_is_common and ref_val == tgt_val:
+                # Plain equality is checked in C first; the option-aware comparison
+                # below is only needed for values that actually differ
+                common[".".join(path + (key,))] = ref_val
+            elif type(ref_val) is list and type(tgt_val) is list:
+                if compare_arrays(ref_val, tgt_val, config, values_equal):
+                    common[".".join(path + (key,))] = ref_val
                 else:
-                    differences[current_path] = {"reference": ref_val, "target": tgt_val}
-            elif compare_values(ref_val, tgt_val, config):
-                common[current_path] = ref_val
+                    differences[".".join(path + (key,))] = {"reference": ref_val, "target": tgt_val}
+            elif values_equal(ref_val, tgt_val):
+                common[".".join(path + (key,))] = ref_val
             else:
-                differences[current_path] = {"reference": ref_val, "target": tgt_val}
-    
+                differences[".".join(path + (key,))] = {"reference": ref_val, "target": tgt_val}
+
+    while identical:
+        reference, path = identical.pop()
+        for key, ref_val in reference.items():
+            if key in ignore_keys:
+                continue
+            if type(ref_val) is dict:
+                identical.append((ref_val, path + (key,)))
+            else:
+                common[".".join(path + (key,))] = ref_val
+
     return missing, common, differences, additional
 
 def calculate_accuracy(missing: Dict, common: Dict, differences: Dict, additional: Dict) -> Dict[str, float]:
@@ -179,135 +391,149 @@ def calculate_accuracy(missing: Dict, common: Dict, differences: Dict, additiona
         "value_accuracy": round(value_accuracy, 2)
     }
 
+def compare_target(target_file, reference_data: Dict[str, Any],
+                   folded: Dict[str, str], config: ComparisonConfig) -> Dict[str, Any]:
+    """Load a single target file and compare it against the reference data."""
+    label = file_label(target_file.filename)
+
+    # Load target data with improved error handling
+    try:
+        target_data, error = load_json(target_file)
+        if error:
+            return {
+                "file": label,
+                "error": f"Error loading target file: {error}",
+                "missing": {},
+                "common": {},
+                "differences": {},
+                "additional": {},
+                "accuracy": {
+                    "overall_accuracy": 0.0,
+                    "key_presence_accuracy": 0.0,
+                    "value_accuracy": 0.0
+                }
+            }
+    except Exception as e:
+        return {
+            "file": label,
+            "error": f"Failed to process target file: {str(e)}",
+            "missing": {},
+            "common": {},
+            "differences": {},
+            "additional": {},
+            "accuracy": {
+                "overall_accuracy": 0.0,
+                "key_presence_accuracy": 0.0,
+                "value_accuracy": 0.0
+            }
+        }
+    
+    # Compare data
+    try:
+        missing, common, differences, additional = compare_json(
+            reference_data, target_data, config, folded=folded)
+        
+        # Calculate accuracy metrics
+        accuracy = calculate_accuracy(missing, common, differences, additional)
+        
+        return {
+            "file": label,
+            "missing": missing,
+            "common": common,
+            "differences": differences,
+            "additional": additional,
+            "accuracy": accuracy
+        }
+    except Exception as e:
+        return {
+            "file": label,
+            "error": f"Error during comparison: {str(e)}",
+            "missing": {},
+            "common": {},
+            "differences": {},
+            "additional": {},
+            "accuracy": {
+                "overall_accuracy": 0.0,
+                "key_presence_accuracy": 0.0,
+                "value_accuracy": 0.0
+            }
+        }
+
+def _parse_form_json(value: Optional[str], default: Any) -> Any:
+    """Parse an optional JSON form field, skipping the parse when it is empty."""
+    if not value or value == '{}':
+        return default
+    return _json_loads(value)
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    limit_mb = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({"error": f"Upload too large: the limit is {limit_mb}MB per request"}), 413
+
 @app.route('/api/compare', methods=['POST'])
 def compare():
+    # Reject oversized uploads from the Content-Length header, before the form parser reads the body
+    if request.content_length is not None and request.content_length > app.config['MAX_CONTENT_LENGTH']:
+        raise RequestEntityTooLarge()
+
     try:
         if 'reference' not in request.files:
             return jsonify({"error": "No reference file provided"}), 400
         
         # Get comparison configuration from request
-        config = ComparisonConfig(
-            ignore_order=request.form.get('ignore_order', 'false').lower() == 'true',
-            case_insensitive=request.form.get('case_insensitive', 'false').lower() == 'true',
-            numeric_tolerance=float(request.form.get('numeric_tolerance', '0.0')),
-            ignore_keys=request.form.get('ignore_keys', '').split(',') if request.form.get('ignore_keys') else [],
-            custom_rules=json.loads(request.form.get('custom_rules', '{}')),
-            schema=json.loads(request.form.get('schema', '{}')) if request.form.get('schema') else None,
-            compare_keys_only=request.form.get('compare_keys_only', 'false').lower() == 'true'
-        )
+        form = request.form
+        numeric_tolerance = form.get('numeric_tolerance')
+        ignore_keys = form.get('ignore_keys')
+        try:
+            config = ComparisonConfig(
+                ignore_order=form.get('ignore_order', 'false').lower() == 'true',
+                case_insensitive=form.get('case_insensitive', 'false').lower() == 'true',
+                numeric_tolerance=float(numeric_tolerance) if numeric_tolerance else 0.0,
+                ignore_keys=ignore_keys.split(',') if ignore_keys else [],
+                custom_rules=_parse_form_json(form.get('custom_rules'), {}),
+                schema=_parse_form_json(form.get('schema'), None),
+                compare_keys_only=form.get('compare_keys_only', 'false').lower() == 'true'
+            )
+        except fastjsonschema.JsonSchemaDefinitionException as e:
+            return jsonify({"error": f"Invalid JSON schema: {str(e)}"}), 400
         
         reference_file = request.files['reference']
         if reference_file.filename == '':
             return jsonify({"error": "No reference file selected"}), 400
 
-        # Save reference file
-        reference_path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(reference_file.filename))
-        reference_file.save(reference_path)
-        
         # Load reference data with improved error handling
         try:
-            reference_data, error = load_json(reference_path)
+            reference_data, error = load_json(reference_file)
             if error:
                 return jsonify({"error": f"Error loading reference file: {error}"}), 400
         except Exception as e:
             return jsonify({"error": f"Failed to process reference file: {str(e)}"}), 400
         
-        results = []
-        
         # Process each target file
         target_files = request.files.getlist('targets')
         
         if not target_files or all(file.filename == '' for file in target_files):
             return jsonify({"error": "No target files provided"}), 400
         
-        for target_file in target_files:
-            if target_file.filename == '':
-                continue
-                
-            target_path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(target_file.filename))
-            target_file.save(target_path)
-            
-            # Load target data with improved error handling
-            try:
-                target_data, error = load_json(target_path)
-                if error:
-                    results.append({
-                        "file": target_file.filename,
-                        "error": f"Error loading target file: {error}",
-                        "missing": {},
-                        "common": {},
-                        "differences": {},
-                        "additional": {},
-                        "accuracy": {
-                            "overall_accuracy": 0.0,
-                            "key_presence_accuracy": 0.0,
-                            "value_accuracy": 0.0
-                        }
-                    })
-                    continue
-            except Exception as e:
-                results.append({
-                    "file": target_file.filename,
-                    "error": f"Failed to process target file: {str(e)}",
-                    "missing": {},
-                    "common": {},
-                    "differences": {},
-                    "additional": {},
-                    "accuracy": {
-                        "overall_accuracy": 0.0,
-                        "key_presence_accuracy": 0.0,
-                        "value_accuracy": 0.0
-                    }
-                })
-                continue
-            
-            # Compare data
-            try:
-                missing, common, differences, additional = compare_json(reference_data, target_data, config)
-                
-                # Calculate accuracy metrics
-                accuracy = calculate_accuracy(missing, common, differences, additional)
-                
-                results.append({
-                    "file": target_file.filename,
-                    "missing": missing,
-                    "common": common,
-                    "differences": differences,
-                    "additional": additional,
-                    "accuracy": accuracy
-                })
-            except Exception as e:
-                results.append({
-                    "file": target_file.filename,
-                    "error": f"Error during comparison: {str(e)}",
-                    "missing": {},
-                    "common": {},
-                    "differences": {},
-                    "additional": {},
-                    "accuracy": {
-                        "overall_accuracy": 0.0,
-                        "key_presence_accuracy": 0.0,
-                        "value_accuracy": 0.0
-                    }
-                })
-            
-            # Clean up temp files
-            try:
-                os.remove(target_path)
-            except:
-                pass
-        
-        # Clean up reference file
-        try:
-            os.remove(reference_path)
-        except:
-            pass
+        # Each target is compared independently against the same reference data,
+        # so uploads are read and compared concurrently
+        target_files = [file for file in target_files if file.filename != '']
+        # Strings lowercased for case-insensitive comparison are memoized for the whole request
+        folded = {}
+        with ThreadPoolExecutor(max_workers=min(8, len(target_files))) as executor:
+            results = list(executor.map(
+                lambda target_file: compare_target(
+                    target_file, reference_data, folded, config),
+                target_files))
         
         return jsonify(results)
+    except RequestEntityTooLarge:
+        # Raised by the form parser for bodies without a usable Content-Length
+        raise
     except Exception as e:
         return jsonify({"error": f"Failed to process comparison: {str(e)}"}), 500
 
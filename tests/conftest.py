@@ -0,0 +1,26 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def compare(client):
+    """Post a reference and target files to /api/compare and return (status, json)."""
+    def post(reference, targets, **form):
+        data = dict(form)
+        data["reference"] = (io.BytesIO(reference), "reference.json")
+        data["targets"] = [(io.BytesIO(content), name) for name, content in targets]
+        response = client.post("/api/compare", data=data, content_type="multipart/form-data")
+        return response.status_code, response.get_json()
+    return post
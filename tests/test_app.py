@@ -0,0 +1,275 @@
+import importlib.util
+import io
+import sys
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.test import EnvironBuilder
+
+import app
+
+
+def test_large_integers_are_compared_exactly(compare):
+    status, results = compare(b'{"id": 123456789012345678901}',
+                              [("target.json", b'{"id": 123456789012345678902}')])
+    assert status == 200
+    assert results[0]["common"] == {}
+    assert results[0]["differences"] == {
+        "id": {"reference": 123456789012345678901, "target": 123456789012345678902}
+    }
+
+
+def test_large_negative_integers_are_kept_exact(compare):
+    status, results = compare(b'{"id": -9223372036854775809}',
+                              [("target.json", b'{"id": -9223372036854775809}')])
+    assert status == 200
+    assert results[0]["common"] == {"id": -9223372036854775809}
+
+
+@pytest.mark.parametrize("document, value", [
+    (b'{"a": NaN}', "nan"),
+    (b'{"a": Infinity}', "inf"),
+    (b'{"a": -Infinity}', "-inf"),
+    (b'{"a": "\\ud800"}', "\ud800"),
+])
+def test_standard_library_json_extensions_are_accepted(document, value):
+    data, error = app.load_json(io.BytesIO(document))
+    assert error is None
+    assert str(data["a"]) == value
+
+
+def test_nanosecond_timestamps_are_not_treated_as_long_integers():
+    assert app._LONG_INTEGER_BYTES.search(b'{"t": 1700000000123456789}') is None
+    assert app._LONG_INTEGER_BYTES.search(b'{"t": -1700000000123456789}')
+    assert app._LONG_INTEGER_BYTES.search(b'{"t": 17000000001234567890}')
+
+
+@pytest.mark.parametrize("arr1, arr2, options, expected", [
+    (["a", "b", "a"], ["a", "a", "b"], {}, True),
+    (["a", "b"], ["a", "a"], {}, False),
+    ([1, 2, 3], [3, 1, 2.0], {}, True),
+    ([1, 1, 2], [1, 2, 2], {}, False),
+    ([True, False], [False, True], {}, True),
+    ([True], ["true"], {}, False),
+    ([1, "1", None], [None, "1", 1], {}, True),
+    ([{"a": 1}, [1, 2]], [[1, 2], {"a": 1}], {}, True),
+    ([{"a": 1}, [1, 2]], [[2, 1], {"a": 1}], {}, False),
+    (["Foo", "BAR"], ["bar", "foo"], {"case_insensitive": True}, True),
+    (["Foo", "BAR"], ["bar", "foo"], {}, False),
+    # Sorted pairing finds the match a greedy scan would miss
+    ([1, 2, 0], [0, 1, 2], {"numeric_tolerance": 1}, True),
+    ([1.0, 5.0], [1.5, 6.0], {"numeric_tolerance": 0.5}, False),
+    ([1, 2], [1, 2, 2], {}, False),
+])
+def test_compare_arrays_ignoring_order(arr1, arr2, options, expected):
+    config = app.ComparisonConfig(ignore_order=True, **options)
+    assert app.compare_arrays(arr1, arr2, config) is expected
+
+
+def test_compare_arrays_respects_order_by_default():
+    config = app.ComparisonConfig()
+    assert app.compare_arrays([1, 2], [1, 2], config)
+    assert not app.compare_arrays([1, 2], [2, 1], config)
+
+
+VALUE_PAIRS = [(1, 1), (1, 1.4), (1, 2), (1.0, 1.5), (10**20, 10**20 + 1), (True, 1), (1, "1"),
+               ("a", "a"), ("a", "A"), (None, None), (None, 0), ([1], [1])]
+
+
+@pytest.mark.parametrize("options", [
+    {}, {"numeric_tolerance": 0.5}, {"numeric_tolerance": 1}, {"numeric_tolerance": -1},
+    {"case_insensitive": True}, {"case_insensitive": True, "numeric_tolerance": 0.5},
+])
+def test_value_comparator_matches_compare_values(options):
+    config = app.ComparisonConfig(**options)
+    values_equal = app.value_comparator(config)
+    for val1, val2 in VALUE_PAIRS:
+        assert values_equal(val1, val2) == app.compare_values(val1, val2, config), (val1, val2)
+
+
+def test_numeric_tolerance_comparison(compare):
+    status, results = compare(b'{"a": 1.0, "b": 10, "c": 2.5}', [("target.json", b'{"a": 1.25, "b": 11, "c": 3.5}')],
+                              numeric_tolerance="0.5")
+    assert status == 200
+    assert results[0]["common"] == {"a": 1.0}
+    assert set(results[0]["differences"]) == {"b", "c"}
+
+
+def test_case_insensitive_comparator_memoizes_lowercased_strings():
+    folded = {}
+    values_equal = app.value_comparator(app.ComparisonConfig(case_insensitive=True), folded)
+    assert values_equal("Foo", "fOO")
+    assert not values_equal("Foo", "bar")
+    assert values_equal(1, 1.0)
+    assert folded == {"Foo": "foo", "fOO": "foo", "bar": "bar"}
+
+
+def test_case_insensitive_comparison(compare):
+    status, results = compare(b'{"a": "Foo", "b": ["X", "y"], "c": "bar"}',
+                              [("target.json", b'{"a": "fOO", "b": ["x", "Y"], "c": "baz"}')],
+                              case_insensitive="true")
+    assert status == 200
+    assert results[0]["common"] == {"a": "Foo", "b": ["X", "y"]}
+    assert results[0]["differences"] == {"c": {"reference": "bar", "target": "baz"}}
+
+
+def test_latin1_target_is_decoded(compare):
+    status, results = compare(b'{"a": "caf\xc3\xa9"}', [("target.json", b'{"a": "caf\xe9"}')])
+    assert status == 200
+    assert results[0]["common"] == {"a": "caf\u00e9"}
+
+
+@pytest.mark.parametrize("ref", ["file:///etc/hostname", "http://127.0.0.1:1/schema.json", "other.json"])
+def test_schema_remote_refs_are_rejected(compare, ref):
+    status, body = compare(b'{"a": 1}', [("target.json", b'{"a": 1}')], schema='{"$ref": "%s"}' % ref)
+    assert status == 400
+    assert body["error"] == f"Invalid JSON schema: Remote $ref is not allowed: {ref}"
+
+
+def test_schema_local_refs_still_resolve(compare):
+    schema = '{"definitions": {"a": {"type": "string"}}, "properties": {"a": {"$ref": "#/definitions/a"}}}'
+    status, results = compare(b'{"a": "x"}', [("target.json", b'{"a": 1}')], schema=schema)
+    assert status == 200
+    assert "schema_error" in results[0]["additional"]
+
+
+def test_schema_with_unsupported_draft_is_rejected(compare):
+    schema = ('{"$schema": "https://json-schema.org/draft/2020-12/schema",'
+              ' "properties": {"a": {"prefixItems": [{"type": "string"}]}}}')
+    status, body = compare(b'{"a": [1]}', [("target.json", b'{"a": [1]}')], schema=schema)
+    assert status == 400
+    assert body["error"] == ("Invalid JSON schema: Unsupported $schema "
+                             "'https://json-schema.org/draft/2020-12/schema', use draft-04, draft-06 or draft-07")
+
+
+@pytest.mark.parametrize("version", ["http://json-schema.org/draft-04/schema#", "http://json-schema.org/draft-07/schema#"])
+def test_schema_with_supported_draft_validates(compare, version):
+    schema = '{"$schema": "%s", "required": ["b"]}' % version
+    status, results = compare(b'{"a": 1}', [("target.json", b'{"a": 1}')], schema=schema)
+    assert status == 200
+    assert "schema_error" in results[0]["additional"]
+
+
+def test_schema_defaults_are_not_written_into_documents(compare):
+    schema = '{"properties": {"b": {"default": 5}, "c": {"default": "x"}}}'
+    status, results = compare(b'{"a": 1, "b": 5}', [("target.json", b'{"a": 1}')], schema=schema)
+    assert status == 200
+    assert results[0]["missing"] == {"b": 5}
+    assert results[0]["additional"] == {}
+    assert results[0]["accuracy"]["overall_accuracy"] == 50.0
+
+
+@pytest.mark.parametrize("fmt", ["email", "uri", "date-time", "uuid", "duration"])
+def test_schema_formats_are_annotations_only(compare, fmt):
+    schema = '{"properties": {"a": {"type": "string", "format": "%s"}}}' % fmt
+    status, results = compare(b'{"a": "not valid"}', [("target.json", b'{"a": "not valid"}')], schema=schema)
+    assert status == 200
+    assert results[0]["common"] == {"a": "not valid"}
+    assert results[0]["additional"] == {}
+
+
+@pytest.mark.parametrize("schema", ['{"pattern": "("}', '[1]', '{"dependencies": {"a": 3}}'])
+def test_malformed_schema_is_rejected(compare, schema):
+    status, body = compare(b'{"a": 1}', [("target.json", b'{"a": 1}')], schema=schema)
+    assert status == 400
+    assert body["error"].startswith("Invalid JSON schema: ")
+
+
+def _oversized_upload():
+    return {"reference": (io.BytesIO(b'{"a": "%s"}' % (b"x" * 2 * 1024 * 1024)), "reference.json"),
+            "targets": [(io.BytesIO(b'{}'), "target.json")]}
+
+
+def test_oversized_upload_is_rejected_from_content_length(client, monkeypatch):
+    monkeypatch.setitem(app.app.config, "MAX_CONTENT_LENGTH", 1024 * 1024)
+    response = client.post("/api/compare", data=_oversized_upload(), content_type="multipart/form-data")
+    assert response.status_code == 413
+    assert response.get_json() == {"error": "Upload too large: the limit is 1MB per request"}
+
+
+def test_oversized_upload_without_content_length_is_rejected(client, monkeypatch):
+    monkeypatch.setitem(app.app.config, "MAX_CONTENT_LENGTH", 1024 * 1024)
+    environ = EnvironBuilder(path="/api/compare", method="POST", data=_oversized_upload()).get_environ()
+    del environ["CONTENT_LENGTH"]
+    environ["wsgi.input_terminated"] = True
+    response = client.open(environ)
+    assert response.status_code == 413
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, "default"),
+    ("", "default"),
+    ("{}", "default"),
+    ('{"a.b": "ignore"}', {"a.b": "ignore"}),
+    ('{"type": "object"}', {"type": "object"}),
+])
+def test_parse_form_json(value, expected):
+    assert app._parse_form_json(value, "default") == expected
+
+
+def test_empty_custom_rules_and_schema_fields_are_accepted(compare):
+    status, results = compare(b'{"a": {"b": 1, "c": 2}}', [("target.json", b'{"a": {"b": 9, "c": 2}}')],
+                              custom_rules="", schema="")
+    assert status == 200
+    assert results[0]["differences"] == {"a.b": {"reference": 1, "target": 9}}
+
+
+def test_custom_rule_ignores_path(compare):
+    status, results = compare(b'{"a": {"b": 1, "c": 2}}', [("target.json", b'{"a": {"b": 9, "c": 2}}')],
+                              custom_rules='{"a.b": "ignore"}')
+    assert status == 200
+    assert results[0]["differences"] == {}
+    assert results[0]["common"] == {"a.c": 2}
+
+
+def test_orjson_provider_sorts_keys_and_round_trips():
+    pytest.importorskip("orjson")
+    provider = app.app.json
+    assert isinstance(provider, app.ORJSONProvider)
+    assert provider.dumps({"b": 1, "a": [1.5, None, "x"]}) == '{"a":[1.5,null,"x"],"b":1}'
+    assert provider.loads(b'{"a": [1.5, null, "x"]}') == {"a": [1.5, None, "x"]}
+    with app.app.app_context():
+        response = provider.response({"b": 1, "a": 2})
+    assert response.mimetype == "application/json"
+    assert response.get_data() == b'{"a":2,"b":1}'
+
+
+def test_orjson_provider_falls_back_for_integers_beyond_64_bits():
+    pytest.importorskip("orjson")
+    assert app.app.json.loads(app.app.json.dumps({"a": 2 ** 64, "b": -2 ** 63 - 1})) == {"a": 2 ** 64, "b": -2 ** 63 - 1}
+
+
+def test_standard_library_json_is_used_without_orjson(monkeypatch):
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    spec = importlib.util.spec_from_file_location("app_without_orjson", app.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert module.orjson is None
+    assert type(module.app.json) is DefaultJSONProvider
+
+    data = {"reference": (io.BytesIO(b'{"id": 123456789012345678901, "a": NaN}'), "reference.json"),
+            "targets": [(io.BytesIO(b'{"id": 123456789012345678901, "b": 1}'), "target.json")]}
+    response = module.app.test_client().post("/api/compare", data=data, content_type="multipart/form-data")
+    assert response.status_code == 200
+    result = response.get_json()[0]
+    assert result["common"] == {"id": 123456789012345678901}
+    assert result["additional"] == {"b": 1}
+
+
+@pytest.mark.parametrize("filename, label", [
+    ("target.json", "target.json"),
+    ("../../etc/target.json", "target.json"),
+    ("C:\\Users\\me\\target.json", "target.json"),
+    ("dir\\sub/target.json", "target.json"),
+    ("x" * 300 + ".json", "x" * 255),
+])
+def test_file_label(filename, label):
+    assert app.file_label(filename) == label
+
+
+def test_results_are_labelled_with_the_file_name(compare):
+    status, results = compare(b'{"a": 1}', [("uploads/nested/target.json", b'{"a": 1}'), ("broken.json", b'{')])
+    assert status == 200
+    assert [result["file"] for result in results] == ["target.json", "broken.json"]
+    assert results[1]["error"].startswith("Error loading target file: Invalid JSON in file broken.json:")